@@ -0,0 +1,78 @@
+"""
+エントリーポイントのimport時間を計測するベンチマーク
+
+使い方:
+    python bench_startup.py              # main / grant_main を各5回計測
+    python bench_startup.py -n 10 --top 20
+
+`python -X importtime` を別プロセスで実行するため、毎回コールドな状態で計測される。
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')
+ENTRY_MODULES = ['main', 'grant_main']
+
+
+def measure_import(module, python=sys.executable):
+    """1回分のimportを計測し、(合計マイクロ秒, {モジュール名: 累積マイクロ秒}) を返す"""
+    env = dict(os.environ, PYTHONPATH=SRC_DIR)
+    result = subprocess.run(
+        [python, '-X', 'importtime', '-c', f'import {module}'],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        # 形式: "import time:   self [us] | cumulative | imported package"
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3:
+            continue
+        name = parts[2].strip()
+        if name == 'site':
+            # インタプリタ起動時(site)のimportは計測対象外
+            cumulative.clear()
+            continue
+        cumulative[name] = int(parts[1].strip())
+
+    return cumulative.get(module, 0), cumulative
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="エントリーポイントのimport時間を計測します")
+    arg_parser.add_argument('-n', '--runs', type=int, default=5, help="計測回数")
+    arg_parser.add_argument('--top', type=int, default=10, help="表示する重いモジュールの数")
+    args = arg_parser.parse_args()
+
+    for module in ENTRY_MODULES:
+        totals = []
+        last_breakdown = {}
+        for _ in range(args.runs):
+            total, last_breakdown = measure_import(module)
+            totals.append(total)
+
+        print(f"=== {module} ({args.runs} runs) ===")
+        print(f"  median: {statistics.median(totals) / 1000:.1f} ms")
+        print(f"  min:    {min(totals) / 1000:.1f} ms")
+        print(f"  max:    {max(totals) / 1000:.1f} ms")
+
+        # トップレベルのパッケージ単位で重いものを表示
+        top_level = {name: us for name, us in last_breakdown.items() if name != module and '.' not in name}
+        heaviest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        print("  heaviest imports:")
+        for name, us in heaviest:
+            print(f"    {us / 1000:8.1f} ms  {name}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
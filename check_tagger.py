@@ -0,0 +1,53 @@
+import os
+import sys
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from tagger import LocalTagger
+
+# config.yaml のキーワード辞書が日本語の記事タイトルにヒットするかを確認する
+with open('config.yaml', 'r', encoding='utf-8') as f:
+    config = yaml.safe_load(f)
+
+tagger = LocalTagger(config['tag_categories'], aliases=config.get('tag_aliases'))
+
+# (タイトル, 含まれるべきタグ, 含まれてはいけないタグ)
+cases = [
+    ("AIが変える未来", ["AI"], []),
+    ("OpenAIが新モデル発表", ["AI"], []),
+    ("Googleが新しいAIモデルを発表", ["AI"], []),
+    ("SQLインジェクション対策まとめ", ["データベース"], []),
+    ("He said the plan was fine", [], ["AI"]),
+    ("MySQLの新機能", ["データベース"], []),
+]
+
+failed = 0
+for title, expected, unexpected in cases:
+    tags = tagger.keyword_tags(title)
+    ok = all(tag in tags for tag in expected) and not any(tag in tags for tag in unexpected)
+    failed += not ok
+    print(f"[{'OK' if ok else 'NG'}] {title} -> {tags}")
+
+# 学習後は、LLMが一貫して付けなかったキーワードのヒットだけで確信ありと判定しないこと
+# （"Word cloud" の "cloud" は「クラウド」のエイリアスにヒットする）
+samples = []
+for i in range(100):
+    samples.append((f"Word cloud visualization tips {i}", "テキスト可視化のライブラリ紹介", []))
+    samples.append((f"AWS のクラウド移行事例 {i}", "クラウド基盤の移行", ["クラウド"]))
+    samples.append((f"Google Cloud の新機能 {i}", "Cloud Run のアップデート", ["クラウド"]))
+    samples.append((f"生成AIで変わる開発 {i}", "LLM を使った開発", ["AI"]))
+    samples.append((f"農業ロボットの新製品 {i}", "スマート農業の自動化", ["農業", "ロボティクス"]))
+tagger.confidence_threshold = config['tagger']['confidence_threshold']
+tagger.train(samples)
+
+tags, confident = tagger.predict("Word cloud visualization tips", "テキスト可視化のライブラリ紹介")
+ok = not ("クラウド" in tags and confident)
+failed += not ok
+print(f"[{'OK' if ok else 'NG'}] Word cloud visualization tips (学習後) -> {tags}, confident={confident}")
+
+if failed:
+    print(f"\n{failed} 件のケースが期待と異なります。")
+    sys.exit(1)
+print("\nすべてのケースが期待通りです。")
@@ -0,0 +1,371 @@
+import argparse
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import yaml
+
+from paths import resolve_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    title TEXT NOT NULL,
+    source TEXT,
+    category TEXT,
+    matched_keyword TEXT,
+    summary TEXT,
+    original_summary TEXT,
+    tags TEXT,
+    tags_source TEXT,
+    published TEXT,
+    published_at TEXT,
+    collected_at TEXT NOT NULL,
+    archived_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_articles_collected_at ON articles(collected_at);
+CREATE INDEX IF NOT EXISTS idx_articles_published_at ON articles(published_at);
+CREATE INDEX IF NOT EXISTS idx_articles_source ON articles(source, collected_at);
+
+CREATE TABLE IF NOT EXISTS article_tags (
+    article_id INTEGER NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (article_id, tag)
+);
+CREATE INDEX IF NOT EXISTS idx_article_tags_tag ON article_tags(tag, article_id);
+
+-- 日本語は単語区切りがないため trigram トークナイザで部分一致検索する
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, summary, tags,
+    tokenize = 'trigram'
+);
+"""
+
+# trigram トークナイザは3文字未満の語を検索できないため、それより短い語はLIKEで絞り込む
+FTS_MIN_TERM_LENGTH = 3
+
+
+class ArticleArchive:
+    """処理済みの記事をSQLiteに蓄積し、全文検索できるようにする"""
+
+    def __init__(self, db_path='data/archive.sqlite3'):
+        self.db_path = resolve_path(db_path)
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+
+    @classmethod
+    def from_config(cls, config):
+        """config.yaml の archive セクションから生成する（無効なら None）"""
+        archive_config = (config or {}).get('archive') or {}
+        if not archive_config.get('enabled', False):
+            return None
+        return cls(archive_config.get('path', 'data/archive.sqlite3'))
+
+    def close(self):
+        self.conn.close()
+
+    def add_articles(self, articles, kind='news'):
+        """
+        1回の実行分の記事をまとめて保存する
+
+        同じURLの記事が既にあれば要約・タグなどを上書きする（初回の collected_at は保持）。
+
+        Returns:
+            int: 保存した記事数
+        """
+        archived_at = datetime.now().isoformat()
+        rows = []
+        for article in articles:
+            if not article.get('url'):
+                continue
+            rows.append((
+                article['url'],
+                kind,
+                article.get('title', ''),
+                article.get('source'),
+                article.get('category'),
+                article.get('matched_keyword'),
+                article.get('summary'),
+                article.get('original_summary'),
+                ", ".join(article.get('tags') or []),
+                article.get('tags_source'),
+                article.get('published'),
+                article.get('published_at'),
+                article.get('collected_at') or archived_at,
+                archived_at,
+            ))
+        if not rows:
+            return 0
+
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO articles (
+                    url, kind, title, source, category, matched_keyword, summary,
+                    original_summary, tags, tags_source, published, published_at, collected_at, archived_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    kind = excluded.kind,
+                    title = excluded.title,
+                    source = excluded.source,
+                    category = excluded.category,
+                    matched_keyword = excluded.matched_keyword,
+                    summary = excluded.summary,
+                    original_summary = excluded.original_summary,
+                    tags = excluded.tags,
+                    tags_source = excluded.tags_source,
+                    published = excluded.published,
+                    published_at = excluded.published_at,
+                    archived_at = excluded.archived_at
+                """,
+                rows,
+            )
+
+            # 今回保存した記事のIDを引き直し、タグとFTSインデックスを張り替える
+            urls = [row[0] for row in rows]
+            placeholders = ", ".join("?" for _ in urls)
+            saved = self.conn.execute(
+                f"SELECT id, title, summary, tags FROM articles WHERE url IN ({placeholders})",
+                urls,
+            ).fetchall()
+            ids = [(row['id'],) for row in saved]
+
+            self.conn.executemany("DELETE FROM article_tags WHERE article_id = ?", ids)
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO article_tags (article_id, tag) VALUES (?, ?)",
+                [
+                    (row['id'], tag.strip())
+                    for row in saved
+                    for tag in (row['tags'] or '').split(',')
+                    if tag.strip()
+                ],
+            )
+
+            self.conn.executemany("DELETE FROM articles_fts WHERE rowid = ?", ids)
+            self.conn.executemany(
+                "INSERT INTO articles_fts (rowid, title, summary, tags) VALUES (?, ?, ?, ?)",
+                [(row['id'], row['title'], row['summary'] or '', row['tags'] or '') for row in saved],
+            )
+
+        return len(rows)
+
+    def search(self, query='', since_days=None, source=None, tag=None, kind=None, limit=20):
+        """
+        アーカイブを検索する
+
+        Args:
+            query (str): 検索語（空白区切りでAND検索）。空なら新しい順に一覧する
+            since_days (int, optional): 直近何日に収集した記事に絞るか
+            source (str, optional): ソース名で絞り込み
+            tag (str, optional): タグで絞り込み
+            kind (str, optional): 'news' または 'grant'
+            limit (int): 最大件数
+
+        Returns:
+            list[dict]: 記事のリスト（新しい順、全文検索時は関連度順）
+        """
+        conditions = []
+        params = []
+        use_fts = False
+
+        fts_terms = []
+        for term in (query or '').split():
+            if len(term) >= FTS_MIN_TERM_LENGTH:
+                # フレーズとして扱い、FTS5の演算子として解釈されないようにする
+                fts_terms.append('"' + term.replace('"', '""') + '"')
+            else:
+                conditions.append("(a.title LIKE ? OR a.summary LIKE ?)")
+                params.extend([f"%{term}%", f"%{term}%"])
+
+        if fts_terms:
+            use_fts = True
+            conditions.append("articles_fts MATCH ?")
+            params.append(" AND ".join(fts_terms))
+
+        if since_days is not None:
+            cutoff = (datetime.now() - timedelta(days=since_days)).isoformat()
+            conditions.append("a.collected_at >= ?")
+            params.append(cutoff)
+        if source:
+            conditions.append("a.source = ?")
+            params.append(source)
+        if kind:
+            conditions.append("a.kind = ?")
+            params.append(kind)
+        if tag:
+            conditions.append("EXISTS (SELECT 1 FROM article_tags t WHERE t.article_id = a.id AND t.tag = ?)")
+            params.append(tag)
+
+        sql = "SELECT a.* FROM articles a"
+        if use_fts:
+            sql += " JOIN articles_fts ON articles_fts.rowid = a.id"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY bm25(articles_fts)" if use_fts else " ORDER BY a.collected_at DESC"
+        sql += " LIMIT ?"
+        params.append(limit)
+
+        results = []
+        for row in self.conn.execute(sql, params):
+            article = dict(row)
+            article['tags'] = [t.strip() for t in (article['tags'] or '').split(',') if t.strip()]
+            results.append(article)
+        return results
+
+    def tagged_samples(self, tags_source='llm', kind='news', limit=2000):
+        """
+        タグ分類器の学習用に、指定した方法でタグ付けされた記事を新しい順に返す
+
+        Returns:
+            list[tuple[str, str, list[str]]]: (タイトル, 要約, タグ) のリスト。タグなしの記事も含む
+        """
+        rows = self.conn.execute(
+            """
+            SELECT title, summary, tags FROM articles
+            WHERE tags_source = ? AND kind = ?
+            ORDER BY collected_at DESC
+            LIMIT ?
+            """,
+            (tags_source, kind, limit),
+        )
+        return [
+            (row['title'], row['summary'] or '', [t.strip() for t in (row['tags'] or '').split(',') if t.strip()])
+            for row in rows
+        ]
+
+    def compact(self, retention_days, vacuum=False):
+        """
+        保持期間を過ぎた記事を削除し、FTSインデックスを最適化する
+
+        Args:
+            retention_days (int): 保持日数（0以下なら削除しない）
+            vacuum (bool): VACUUMでファイルサイズも縮めるか（時間がかかるため任意）
+
+        Returns:
+            int: 削除した記事数
+        """
+        deleted = 0
+        with self.conn:
+            if retention_days and retention_days > 0:
+                cutoff = (datetime.now() - timedelta(days=retention_days)).isoformat()
+                expired = [
+                    (row['id'],)
+                    for row in self.conn.execute("SELECT id FROM articles WHERE collected_at < ?", (cutoff,))
+                ]
+                self.conn.executemany("DELETE FROM articles_fts WHERE rowid = ?", expired)
+                self.conn.executemany("DELETE FROM articles WHERE id = ?", expired)
+                deleted = len(expired)
+            self.conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('optimize')")
+
+        if vacuum:
+            self.conn.execute("VACUUM")
+        return deleted
+
+    def stats(self):
+        """記事数・期間・ソース別件数を返す"""
+        summary = self.conn.execute(
+            "SELECT COUNT(*) AS total, MIN(collected_at) AS oldest, MAX(collected_at) AS newest FROM articles"
+        ).fetchone()
+        by_source = self.conn.execute(
+            "SELECT source, COUNT(*) AS count FROM articles GROUP BY source ORDER BY count DESC"
+        ).fetchall()
+        return {
+            'total': summary['total'],
+            'oldest': summary['oldest'],
+            'newest': summary['newest'],
+            'by_source': [(row['source'], row['count']) for row in by_source],
+        }
+
+
+def archive_run(config, articles, kind='news'):
+    """パイプラインの最後に呼ぶ: 記事を保存し、保持期間に従って古い記事を整理する"""
+    archive = ArticleArchive.from_config(config)
+    if archive is None:
+        return
+
+    try:
+        saved = archive.add_articles(articles, kind=kind)
+        retention_days = config['archive'].get('retention_days', 0)
+        deleted = archive.compact(retention_days)
+        print(f"アーカイブに {saved} 件を保存しました（期限切れ {deleted} 件を削除）。")
+    except sqlite3.Error as e:
+        print(f"Error writing archive {archive.db_path}: {e}")
+    finally:
+        archive.close()
+
+
+def _load_archive_config(config_path):
+    """CLI用に設定ファイルから archive セクションを読み込む"""
+    full_path = resolve_path(config_path)
+    try:
+        with open(full_path, 'r', encoding='utf-8') as f:
+            return (yaml.safe_load(f) or {}).get('archive') or {}
+    except FileNotFoundError:
+        return {}
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="記事アーカイブを検索・整理します（ネットワーク不要）")
+    arg_parser.add_argument('--config', default='config.yaml', help="archive.path を読む設定ファイル")
+    arg_parser.add_argument('--db', help="SQLiteファイルのパス（設定ファイルより優先）")
+    subparsers = arg_parser.add_subparsers(dest='command', required=True)
+
+    search_parser = subparsers.add_parser('search', help="全文検索する")
+    search_parser.add_argument('query', nargs='?', default='', help="検索語（空白区切りでAND）")
+    search_parser.add_argument('--since', type=int, dest='since_days', help="直近N日に収集した記事のみ")
+    search_parser.add_argument('--source', help="ソース名で絞り込み")
+    search_parser.add_argument('--tag', help="タグで絞り込み")
+    search_parser.add_argument('--kind', choices=['news', 'grant'], help="記事の種類")
+    search_parser.add_argument('--limit', type=int, default=20, help="最大件数")
+
+    compact_parser = subparsers.add_parser('compact', help="保持期間を過ぎた記事を削除して最適化する")
+    compact_parser.add_argument('--retention-days', type=int, help="保持日数（省略時は設定ファイルの値）")
+
+    subparsers.add_parser('stats', help="件数などの統計を表示する")
+
+    args = arg_parser.parse_args(argv)
+    archive_config = _load_archive_config(args.config)
+    archive = ArticleArchive(args.db or archive_config.get('path', 'data/archive.sqlite3'))
+
+    try:
+        if args.command == 'search':
+            results = archive.search(
+                args.query,
+                since_days=args.since_days,
+                source=args.source,
+                tag=args.tag,
+                kind=args.kind,
+                limit=args.limit,
+            )
+            for i, article in enumerate(results, 1):
+                print(f"\n[{i}] {article['title']}")
+                print(f"    Source: {article['source']} ({article['kind']})")
+                print(f"    Collected: {article['collected_at']}")
+                if article['tags']:
+                    print(f"    Tags: {', '.join(article['tags'])}")
+                print(f"    URL: {article['url']}")
+            print(f"\n{len(results)} 件見つかりました。")
+        elif args.command == 'compact':
+            retention_days = args.retention_days
+            if retention_days is None:
+                retention_days = archive_config.get('retention_days', 0)
+            deleted = archive.compact(retention_days, vacuum=True)
+            print(f"{deleted} 件を削除し、アーカイブを最適化しました。")
+        elif args.command == 'stats':
+            stats = archive.stats()
+            print(f"Total: {stats['total']} articles ({stats['oldest']} - {stats['newest']})")
+            for source, count in stats['by_source']:
+                print(f"  {count:6d}  {source}")
+    finally:
+        archive.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import sys
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime
+
+# これ以上長い要約は圧縮して保持する（RSSの本文入り要約は数KBになることがある）
+COMPRESS_MIN_LENGTH = 512
+
+
+def _encode_text(text):
+    """長いテキストは zlib 圧縮した bytes に、短いものはそのまま保持する"""
+    if text is None or len(text) < COMPRESS_MIN_LENGTH:
+        return text
+    return zlib.compress(text.encode('utf-8'), 1)
+
+
+def _decode_text(value):
+    """_encode_text の逆変換（アクセスされた時にだけ展開する）"""
+    if isinstance(value, bytes):
+        return zlib.decompress(value).decode('utf-8')
+    return value
+
+
+# original_summary が summary と同じ内容であることを示す印（同じ文字列を二重に持たない）
+_SAME_AS_SUMMARY = object()
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+@dataclass(slots=True, init=False)
+class Article:
+    """
+    パイプライン内で受け渡す記事レコード
+
+    記事数が増えても省メモリになるよう、
+    - __slots__ でインスタンスごとの __dict__ を持たない
+    - source / category / matched_keyword / tags のような種類の少ない文字列は intern して共有する
+    - 長い要約は圧縮して保持し、参照された時に展開する
+    - original_summary は summary と同じ内容なら別に持たない
+    - collected_at は ISO 文字列ではなく UNIX 時刻で保持する
+
+    助成金の場合は AI で抽出した eligibility / amount / deadline も持ち、
+    シャードの中間ファイル経由で merge 側に引き継ぐ。
+
+    EmailNotifier や NewsSummarizer などの既存コードがそのまま使えるよう、
+    article['title'] や article.get('tags') のような dict 互換のアクセスもできる。
+    """
+
+    title: str
+    url: str
+    source: str
+    category: str
+    published: str
+    published_at: str
+    matched_keyword: str
+    tags: list
+    tags_source: str
+    collected_ts: float
+    eligibility: str
+    amount: str
+    deadline: str
+    _summary: object = field(repr=False)
+    _original_summary: object = field(repr=False)
+
+    # dict 互換アクセスで使えるキー
+    KEYS = (
+        'title', 'url', 'summary', 'original_summary', 'published', 'published_at',
+        'source', 'category', 'matched_keyword', 'tags', 'tags_source', 'collected_at',
+        'eligibility', 'amount', 'deadline',
+    )
+
+    def __init__(self, title='', url='', summary='', source=None, category=None, published='',
+                 published_at=None, matched_keyword=None, tags=None, tags_source=None,
+                 collected_at=None, original_summary=None, eligibility=None, amount=None,
+                 deadline=None):
+        self.title = title
+        self.url = url
+        self.source = _intern(source)
+        self.category = _intern(category)
+        self.published = published
+        self.published_at = published_at
+        self.matched_keyword = _intern(matched_keyword)
+        self.tags = [_intern(tag) for tag in tags] if tags else []
+        self.tags_source = _intern(tags_source)
+        self.eligibility = eligibility
+        self.amount = amount
+        self.deadline = deadline
+        self._summary = _encode_text(summary)
+        self._original_summary = None
+        self.collected_at = collected_at if collected_at is not None else datetime.now().timestamp()
+        self.original_summary = original_summary
+
+    @property
+    def summary(self):
+        return _decode_text(self._summary)
+
+    @summary.setter
+    def summary(self, value):
+        if self._original_summary is _SAME_AS_SUMMARY:
+            # 元の要約を保持している場合は、上書き前の値をそのまま引き継ぐ
+            self._original_summary = self._summary
+        self._summary = _encode_text(value)
+
+    @property
+    def original_summary(self):
+        """元の要約（保持していなければ None）"""
+        if self._original_summary is _SAME_AS_SUMMARY:
+            return self.summary
+        return _decode_text(self._original_summary)
+
+    @original_summary.setter
+    def original_summary(self, value):
+        if value is not None and value == self.summary:
+            # summary と同じ内容なら二重に持たない
+            self._original_summary = _SAME_AS_SUMMARY
+        else:
+            self._original_summary = _encode_text(value)
+
+    @property
+    def collected_at(self):
+        return datetime.fromtimestamp(self.collected_ts).isoformat()
+
+    @collected_at.setter
+    def collected_at(self, value):
+        # ISO 文字列（旧形式の中間ファイル）と UNIX 時刻のどちらも受け付ける
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value).timestamp()
+        self.collected_ts = value
+
+    @classmethod
+    def from_dict(cls, data):
+        """dict（中間ファイルのJSONなど）から生成する。未知のキーは無視する"""
+        return cls(**{key: data[key] for key in cls.KEYS if key in data})
+
+    def to_dict(self):
+        return {key: self[key] for key in self.KEYS}
+
+    # --- dict 互換アクセス ---
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        if key in ('source', 'category', 'matched_keyword', 'tags_source'):
+            value = _intern(value)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.KEYS
+
+    def get(self, key, default=None):
+        value = getattr(self, key) if key in self.KEYS else None
+        return default if value is None else value
+
+    def keys(self):
+        return list(self.KEYS)
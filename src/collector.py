@@ -1,9 +1,14 @@
 import yaml
-import feedparser
-from datetime import datetime, timedelta
-from dateutil import parser
-import os
-import pytz
+from datetime import datetime, timedelta, timezone
+from article import Article
+from paths import resolve_path
+from profiling import NULL_PROFILER
+import time
+from sharding import shard_for
+from source_health import SourceHealth
+
+# 低収穫・障害でしばらく取得しなかったソースを、最大何日前まで遡って取り込むか
+MAX_CATCHUP_DAYS = 7
 
 class NewsCollector:
     def __init__(self, config_path='config.yaml'):
@@ -11,12 +16,13 @@ class NewsCollector:
         self.keywords = self.config.get('keywords', [])
         self.sources = self.config.get('sources', [])
         self.days_limit = self.config.get('days_limit', 1)
+        self.timeout = self.config.get('timeout', 30)  # RSS fetch timeout in seconds
+        self.health = SourceHealth.from_config(self.config)
 
     def _load_config(self, path):
         """YAML設定ファイルを読み込む"""
         # 実行ディレクトリからの相対パスを考慮
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        full_path = os.path.join(base_dir, path)
+        full_path = resolve_path(path)
         
         try:
             with open(full_path, 'r', encoding='utf-8') as f:
@@ -25,37 +31,127 @@ class NewsCollector:
             print(f"Error: Config file not found at {full_path}")
             return {}
 
-    def collect_news(self):
-        """設定されたソースからニュースを収集し、キーワードでフィルタリングする"""
+    def collect_news(self, shard=None, profiler=NULL_PROFILER, dry_run=False):
+        """
+        設定されたソースからニュースを収集し、キーワードでフィルタリングする
+
+        dry_run の時はソースの稼働状況をレポートに出すだけで保存しない
+        （last_success を進めると、スキップされていたソースの遡り取得の範囲が失われるため）。
+        """
+        with profiler.stage('collect'):
+            all_articles = self._fetch_sources(shard)
+
+        # キーワードでフィルタリング
+        with profiler.stage('filter'):
+            filtered_articles = self._filter_by_keywords(all_articles)
+
+        if self.health is not None:
+            # 取得できたソースごとに該当記事数を記録し、実行レポートを出す
+            matched = {}
+            for article in filtered_articles:
+                matched[article['source']] = matched.get(article['source'], 0) + 1
+            for source_name, result in self.health.run_results.items():
+                if result['status'] == 'ok':
+                    self.health.record_yield(source_name, matched.get(source_name, 0))
+            self.health.write_report()
+            if not dry_run:
+                try:
+                    self.health.save()
+                except OSError as e:
+                    print(f"Warning: Failed to save source health to {self.health.path}: {e}")
+
+        return filtered_articles
+
+    def _fetch_sources(self, shard):
+        """担当するソースを順に取得し、フィルタ前の記事をすべて返す"""
         all_articles = []
 
-        for source in self.sources:
+        # 最初のソースのレイテンシにimport時間が含まれないよう、先に読み込んでおく
+        import requests  # noqa: F401
+        import feedparser  # noqa: F401
+
+        for source in self._sources_for_shard(shard):
             source_name = source.get('name')
             source_url = source.get('url')
             source_type = source.get('type')
             source_category = source.get('category', 'Uncategorized')
 
+            if source_type != 'rss':
+                print(f"Unknown source type: {source_type}")
+                continue
+
+            # 障害中・低収穫のソースはスキップ
+            since = None
+            if self.health is not None:
+                fetch, reason = self.health.should_fetch(source_name)
+                if not fetch:
+                    print(f"Skipping: {source_name} ({reason})")
+                    continue
+                since = self.health.last_success(source_name)
+
             print(f"Fetching from: {source_name} ({source_category})...")
 
-            if source_type == 'rss':
-                articles = self._fetch_rss(source_url, source_name, source_category)
-                all_articles.extend(articles)
-            else:
-                print(f"Unknown source type: {source_type}")
+            start = time.monotonic()
+            try:
+                articles, num_bytes = self._fetch_rss(source_url, source_name, source_category, since)
+            except Exception as e:
+                print(f"Error fetching RSS from {source_url}: {e}")
+                if self.health is not None:
+                    self.health.record_failure(source_name, time.monotonic() - start, e)
+                continue
 
-        # キーワードでフィルタリング
-        filtered_articles = self._filter_by_keywords(all_articles)
-        return filtered_articles
+            if self.health is not None:
+                self.health.record_success(source_name, time.monotonic() - start, num_bytes, len(articles))
+            all_articles.extend(articles)
+
+        return all_articles
+
+    def _sources_for_shard(self, shard):
+        """シャード (i, N) が担当するソースだけを返す（ソース名の Consistent Hash で分割）"""
+        if shard is None:
+            return self.sources
+        index, count = shard
+        return [source for source in self.sources if shard_for(source.get('name') or '', count) == index]
+
+    def _fetch_rss(self, url, source_name, source_category, since=None):
+        """
+        RSSフィードから記事を取得
+
+        Args:
+            since (datetime, optional): 前回取得に成功した日時。days_limitより古ければ
+                そこまで遡る（最大 MAX_CATCHUP_DAYS 日）
+
+        Returns:
+            tuple[list[Article], int]: (記事のリスト, 受信バイト数)
+
+        Raises:
+            requests.exceptions.RequestException: タイムアウトやHTTPエラー
+            ValueError: フィードとして解釈できない場合
+        """
+        # requests/feedparser/dateutilは起動時間に効くため、実際に取得する時だけ読み込む
+        import requests
+        import feedparser
+        from dateutil import parser
+
+        response = requests.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        feed = feedparser.parse(response.content)
+
+        # ボゾフラグがあっても、エントリーがあれば処理を続行
+        if feed.get('bozo', False) and not feed.entries:
+            raise ValueError(f"RSS parsing issue: {feed.get('bozo_exception', 'Unknown error')}")
 
-    def _fetch_rss(self, url, source_name, source_category):
-        """RSSフィードから記事を取得"""
-        feed = feedparser.parse(url)
         articles = []
         
         # 基準日時を計算（現在時刻 - days_limit）
-        now = datetime.now(pytz.utc)
+        now = datetime.now(timezone.utc)
         limit_date = now - timedelta(days=self.days_limit) if self.days_limit > 0 else None
+        if limit_date and since:
+            # しばらく取得していなかったソースは前回成功時まで遡る
+            since = max(since.astimezone(timezone.utc), now - timedelta(days=MAX_CATCHUP_DAYS))
+            limit_date = min(limit_date, since)
 
+        collected_at = datetime.now().timestamp()
         for entry in feed.entries:
             # 公開日時を取得・パース
             published_str = entry.get('published', '') or entry.get('updated', '')
@@ -66,7 +162,7 @@ class NewsCollector:
                     published_dt = parser.parse(published_str)
                     # タイムゾーンがない場合はUTC扱いにする
                     if published_dt.tzinfo is None:
-                        published_dt = published_dt.replace(tzinfo=pytz.utc)
+                        published_dt = published_dt.replace(tzinfo=timezone.utc)
                 except Exception:
                     pass # パース失敗時は日付チェックをスキップ（または除外）
 
@@ -75,18 +171,19 @@ class NewsCollector:
                 if published_dt < limit_date:
                     continue # 古い記事はスキップ
 
-            article = {
-                'title': entry.get('title', ''),
-                'url': entry.get('link', ''),
-                'summary': entry.get('summary', '') or entry.get('description', ''),
-                'published': published_str,
-                'source': source_name,
-                'category': source_category,
-                'collected_at': datetime.now().isoformat()
-            }
+            article = Article(
+                title=entry.get('title', ''),
+                url=entry.get('link', ''),
+                summary=entry.get('summary', '') or entry.get('description', ''),
+                published=published_str,
+                published_at=published_dt.isoformat() if published_dt else None,
+                source=source_name,
+                category=source_category,
+                collected_at=collected_at,
+            )
             articles.append(article)
         
-        return articles
+        return articles, len(response.content)
 
     def _filter_by_keywords(self, articles):
         """キーワードが含まれる記事のみを抽出"""
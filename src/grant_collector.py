@@ -1,10 +1,9 @@
 import yaml
-import feedparser
-from datetime import datetime, timedelta
-from dateutil import parser
-import os
-import pytz
-import requests
+from datetime import datetime, timedelta, timezone
+from article import Article
+from paths import resolve_path
+from profiling import NULL_PROFILER
+from sharding import shard_for
 
 class GrantCollector:
     def __init__(self, config_path='grant_config.yaml'):
@@ -17,8 +16,7 @@ class GrantCollector:
     def _load_config(self, path):
         """YAML設定ファイルを読み込む"""
         # 実行ディレクトリからの相対パスを考慮
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        full_path = os.path.join(base_dir, path)
+        full_path = resolve_path(path)
         
         try:
             with open(full_path, 'r', encoding='utf-8') as f:
@@ -27,11 +25,21 @@ class GrantCollector:
             print(f"Error: Config file not found at {full_path}")
             return {}
 
-    def collect_grants(self):
+    def collect_grants(self, shard=None, profiler=NULL_PROFILER):
         """設定されたソースから助成金情報を収集し、キーワードでフィルタリングする"""
+        with profiler.stage('collect'):
+            all_articles = self._fetch_sources(shard)
+
+        # キーワードでフィルタリング
+        with profiler.stage('filter'):
+            filtered_articles = self._filter_by_keywords(all_articles)
+        return filtered_articles
+
+    def _fetch_sources(self, shard):
+        """担当するソースを順に取得し、フィルタ前の記事をすべて返す"""
         all_articles = []
 
-        for source in self.sources:
+        for source in self._sources_for_shard(shard):
             source_name = source.get('name')
             source_url = source.get('url')
             source_type = source.get('type')
@@ -45,12 +53,22 @@ class GrantCollector:
             else:
                 print(f"Unknown source type: {source_type}")
 
-        # キーワードでフィルタリング
-        filtered_articles = self._filter_by_keywords(all_articles)
-        return filtered_articles
+        return all_articles
+
+    def _sources_for_shard(self, shard):
+        """シャード (i, N) が担当するソースだけを返す（ソース名の Consistent Hash で分割）"""
+        if shard is None:
+            return self.sources
+        index, count = shard
+        return [source for source in self.sources if shard_for(source.get('name') or '', count) == index]
 
     def _fetch_rss(self, url, source_name, source_category):
         """RSSフィードから記事を取得"""
+        # requests/feedparser/dateutilは起動時間に効くため、実際に取得する時だけ読み込む
+        import requests
+        import feedparser
+        from dateutil import parser
+
         articles = []
         
         try:
@@ -76,9 +94,10 @@ class GrantCollector:
             return []
         
         # 基準日時を計算（現在時刻 - days_limit）
-        now = datetime.now(pytz.utc)
+        now = datetime.now(timezone.utc)
         limit_date = now - timedelta(days=self.days_limit) if self.days_limit > 0 else None
 
+        collected_at = datetime.now().timestamp()
         for entry in feed.entries:
             # 公開日時を取得・パース
             published_str = entry.get('published', '') or entry.get('updated', '')
@@ -89,7 +108,7 @@ class GrantCollector:
                     published_dt = parser.parse(published_str)
                     # タイムゾーンがない場合はUTC扱いにする
                     if published_dt.tzinfo is None:
-                        published_dt = published_dt.replace(tzinfo=pytz.utc)
+                        published_dt = published_dt.replace(tzinfo=timezone.utc)
                 except (ValueError, parser.ParserError) as e:
                     print(f"Warning: Failed to parse date '{published_str}' for {source_name}: {e}")
                     pass # パース失敗時は日付チェックをスキップ（または除外）
@@ -99,15 +118,16 @@ class GrantCollector:
                 if published_dt < limit_date:
                     continue # 古い記事はスキップ
 
-            article = {
-                'title': entry.get('title', ''),
-                'url': entry.get('link', ''),
-                'summary': entry.get('summary', '') or entry.get('description', ''),
-                'published': published_str,
-                'source': source_name,
-                'category': source_category,
-                'collected_at': datetime.now().isoformat()
-            }
+            article = Article(
+                title=entry.get('title', ''),
+                url=entry.get('link', ''),
+                summary=entry.get('summary', '') or entry.get('description', ''),
+                published=published_str,
+                published_at=published_dt.isoformat() if published_dt else None,
+                source=source_name,
+                category=source_category,
+                collected_at=collected_at,
+            )
             articles.append(article)
         
         return articles
@@ -0,0 +1,126 @@
+import os
+import sqlite3
+from datetime import date, datetime, timedelta
+
+from paths import resolve_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS grants (
+    url TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    summary TEXT,
+    eligibility TEXT,
+    amount TEXT,
+    deadline TEXT,
+    extracted_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_grants_deadline ON grants(deadline);
+"""
+
+
+class GrantIndex:
+    """
+    助成金情報からAIで抽出した構造化情報（対象者・金額・申請期限）をURLごとに保存する
+
+    一度抽出した助成金は次回以降LLMを呼ばずに再利用し、期限切れのものは配信から外す。
+    """
+
+    def __init__(self, db_path='data/grant_index.sqlite3'):
+        self.db_path = resolve_path(db_path)
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+
+        # シャード実行で複数プロセスから書き込まれるため、ロック待ちを長めにとる
+        self.conn = sqlite3.connect(self.db_path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    @classmethod
+    def from_config(cls, config):
+        """grant_config.yaml の grant_index セクションから生成する（無効なら None）"""
+        index_config = (config or {}).get('grant_index') or {}
+        if not index_config.get('enabled', False):
+            return None
+        return cls(index_config.get('path', 'data/grant_index.sqlite3'))
+
+    def close(self):
+        self.conn.close()
+
+    def get_many(self, urls):
+        """
+        URLのリストに対応する抽出済み情報をまとめて取得する
+
+        Returns:
+            dict[str, dict]: URL -> {title, summary, eligibility, amount, deadline, extracted_at}
+        """
+        urls = [url for url in urls if url]
+        if not urls:
+            return {}
+        placeholders = ", ".join("?" for _ in urls)
+        rows = self.conn.execute(f"SELECT * FROM grants WHERE url IN ({placeholders})", urls)
+        return {row['url']: dict(row) for row in rows}
+
+    def put(self, url, title, metadata):
+        """summarize_grant の結果を保存する（同じURLは上書き）"""
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO grants (url, title, summary, eligibility, amount, deadline, extracted_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    title = excluded.title,
+                    summary = excluded.summary,
+                    eligibility = excluded.eligibility,
+                    amount = excluded.amount,
+                    deadline = excluded.deadline,
+                    extracted_at = excluded.extracted_at
+                """,
+                (
+                    url,
+                    title,
+                    metadata.get('summary'),
+                    metadata.get('eligibility'),
+                    metadata.get('amount'),
+                    metadata.get('deadline'),
+                    datetime.now().isoformat(),
+                ),
+            )
+
+    def prune(self, retention_days):
+        """
+        期限から retention_days 日以上過ぎた助成金と、期限不明で同じ日数以上前に抽出したものを削除する
+
+        Returns:
+            int: 削除した件数
+        """
+        if not retention_days or retention_days <= 0:
+            return 0
+        cutoff_date = (date.today() - timedelta(days=retention_days)).isoformat()
+        cutoff_time = (datetime.now() - timedelta(days=retention_days)).isoformat()
+        with self.conn:
+            cursor = self.conn.execute(
+                """
+                DELETE FROM grants
+                WHERE (deadline IS NOT NULL AND deadline < ?)
+                   OR (deadline IS NULL AND extracted_at < ?)
+                """,
+                (cutoff_date, cutoff_time),
+            )
+        return cursor.rowcount
+
+
+def is_expired(metadata, today=None):
+    """
+    申請期限が今日より前なら True（期限不明なら False）
+
+    metadata は抽出結果の dict と、deadline を持つ Article のどちらでもよい。
+    """
+    deadline = metadata.get('deadline')
+    if not deadline:
+        return False
+    return deadline < (today or date.today()).isoformat()
+
+
+def deadline_sort_key(metadata):
+    """期限が近い順に並べ、期限不明のものは最後に回すためのキー"""
+    deadline = metadata.get('deadline')
+    return (deadline is None, deadline or '')
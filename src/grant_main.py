@@ -1,45 +1,206 @@
 from grant_collector import GrantCollector
-from notifier import EmailNotifier
-from summarizer import NewsSummarizer
+from sharding import parse_shard
+from profiling import PROFILE_MODES, StageProfiler
+import argparse
 import os
+from datetime import date
+from grant_index import GrantIndex, deadline_sort_key, is_expired
 from dotenv import load_dotenv
 
 # .envファイルがあれば読み込む
 load_dotenv()
 
-def main():
-    # コレクターの初期化
-    collector = GrantCollector()
-    
-    # 助成金情報収集実行
-    print("助成金情報の収集を開始します...")
-    articles = collector.collect_grants()
-    
-    print(f"\n収集完了: {len(articles)} 件の助成金情報が見つかりました。")
+def parse_args(argv=None):
+    """コマンドライン引数を解析する"""
+    arg_parser = argparse.ArgumentParser(description="助成金情報を収集・要約してメールで配信します")
+    arg_parser.add_argument(
+        '--dry-run', '--fetch-only',
+        dest='dry_run',
+        action='store_true',
+        help="収集とキーワードフィルタリングのみ実行し、AI要約とメール送信は行わない",
+    )
+    mode = arg_parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        '--shard',
+        type=parse_shard,
+        metavar='i/N',
+        help="N分割したソースのうち i 番目（0始まり）だけを収集・要約し、中間ファイルに書き出す",
+    )
+    mode.add_argument(
+        '--merge',
+        action='store_true',
+        help="全シャードの中間ファイルを結合し、メール送信を行う",
+    )
+    arg_parser.add_argument(
+        '--shard-dir',
+        default='data/shards',
+        help="シャードの中間ファイルを置くディレクトリ（デフォルト: data/shards）",
+    )
+    arg_parser.add_argument(
+        '--profile',
+        choices=PROFILE_MODES,
+        help="各ステージを cProfile (cpu) または tracemalloc (mem) で計測する",
+    )
+    arg_parser.add_argument(
+        '--profile-dir',
+        default='data/profiles',
+        help="プロファイル結果の出力先（デフォルト: data/profiles）",
+    )
+    return arg_parser.parse_args(argv)
+
+def format_grant_summary(metadata):
+    """抽出した構造化情報をメール本文用のテキストにする"""
+    lines = []
+    if metadata.get('deadline'):
+        lines.append(f"申請期限: {metadata['deadline']}")
+    if metadata.get('amount'):
+        lines.append(f"支援内容: {metadata['amount']}")
+    if metadata.get('eligibility'):
+        lines.append(f"対象: {metadata['eligibility']}")
+    if metadata.get('summary'):
+        lines.append(metadata['summary'])
+    return "\n".join(lines)
+
+def summarize_grants(articles, index):
+    """
+    各助成金情報を事業者向けに要約し、対象者・金額・申請期限を抽出する
+
+    抽出済み（インデックスにある）助成金はLLMを呼ばずに再利用する。
+    抽出した情報は記事自体に持たせ、シャードの中間ファイル経由で merge 側にも引き継ぐ。
+    """
+    cached = index.get_many([article['url'] for article in articles]) if index is not None else {}
+
+    # google.genaiは重いため、未抽出の助成金がある時だけ読み込む
+    summarizer = None
+    if any(article['url'] not in cached for article in articles):
+        from summarizer import NewsSummarizer
 
-    # AI要約の実行
-    if articles:
-        print("\nAI要約を開始します...")
         summarizer = NewsSummarizer()
-        for i, article in enumerate(articles, 1):
+
+    llm_calls = 0
+    for i, article in enumerate(articles, 1):
+        metadata = cached.get(article['url'])
+        if metadata is not None:
+            print(f"[{i}/{len(articles)}] Already extracted: {article['title']}")
+        else:
             print(f"[{i}/{len(articles)}] Summarizing: {article['title']}...")
-            # 元の要約を保持
-            article['original_summary'] = article['summary']
-            # 助成金情報用のプロンプトを使用
-            ai_summary = summarizer.summarize_grant(article['title'], article['summary'])
-            article['summary'] = ai_summary # 要約を上書き
+            # 助成金情報用のプロンプト（構造化出力）を使用
+            metadata = summarizer.summarize_grant(article['title'], article['summary'])
+            llm_calls += 1
+            if metadata is None:
+                # 抽出できなかった助成金は元の概要のまま配信し、次回また抽出するようインデックスには保存しない
+                metadata = {'summary': article['summary'], 'eligibility': None, 'amount': None, 'deadline': None}
+            elif index is not None and article['url']:
+                index.put(article['url'], article['title'], metadata)
+        article['eligibility'] = metadata.get('eligibility')
+        article['amount'] = metadata.get('amount')
+        article['deadline'] = metadata.get('deadline')
+
+        # 元の要約を保持
+        article['original_summary'] = article['summary']
+        article['summary'] = format_grant_summary(metadata) # 要約を上書き
+
+    print(f"\nAI要約: LLM {llm_calls} 件 / 抽出済み {len(articles) - llm_calls} 件")
 
-    # 結果を表示（デバッグ用）
+def order_by_deadline(articles):
+    """申請期限切れの助成金を除き、期限の近い順（期限不明は最後）に並べる"""
+    today = date.today()
+    upcoming = [article for article in articles if not is_expired(article, today)]
+    if len(upcoming) < len(articles):
+        print(f"申請期限切れの助成金 {len(articles) - len(upcoming)} 件を除外しました。")
+    upcoming.sort(key=deadline_sort_key)
+    return upcoming
+
+def print_articles(articles):
+    """結果を表示（デバッグ用）"""
     for i, article in enumerate(articles, 1):
         print(f"\n[{i}] {article['title']}")
         print(f"    Source: {article['source']}")
         print(f"    Keyword: {article.get('matched_keyword')}")
         print(f"    URL: {article['url']}")
 
+def main(argv=None):
+    args = parse_args(argv)
+    label = f"grant-shard{args.shard[0]}of{args.shard[1]}" if args.shard else 'grant'
+    profiler = StageProfiler(args.profile, args.profile_dir, label=label)
+    try:
+        run(args, profiler)
+    finally:
+        profiler.finish()
+
+def run(args, profiler):
+    # コレクターの初期化
+    collector = GrantCollector()
+    
+    shard_files = []
+    if args.merge:
+        # 各シャードの処理結果を結合（収集・要約は済んでいる）
+        from sharding import read_shards
+
+        print("シャードの処理結果を結合します...")
+        with profiler.stage('merge'):
+            articles, shard_files = read_shards(args.shard_dir, 'grant')
+        print(f"\n結合完了: {len(shard_files)} シャードから {len(articles)} 件の助成金情報を読み込みました。")
+    else:
+        # 助成金情報収集実行
+        if args.shard:
+            print(f"助成金情報の収集を開始します (shard {args.shard[0]}/{args.shard[1]})...")
+        else:
+            print("助成金情報の収集を開始します...")
+        articles = collector.collect_grants(shard=args.shard, profiler=profiler)
+        
+        print(f"\n収集完了: {len(articles)} 件の助成金情報が見つかりました。")
+
+    # AI要約・構造化情報の抽出
+    index = None
+    if articles and not args.dry_run:
+        index = GrantIndex.from_config(collector.config)
+        # merge 時は各シャードで抽出済みの情報が中間ファイルの記事に入っている
+        # （別ランナーで実行したシャードのインデックスはここからは見えない）
+        if not args.merge:
+            print("\nAI要約を開始します...")
+            with profiler.stage('summarize'):
+                summarize_grants(articles, index)
+        if not args.shard:
+            articles = order_by_deadline(articles)
+
+    print_articles(articles)
+
+    if args.dry_run:
+        print("\n--dry-run のためAI要約とメール送信をスキップしました。")
+        return
+
+    if args.shard:
+        from sharding import write_shard
+
+        with profiler.stage('write_shard'):
+            path = write_shard(args.shard_dir, 'grant', args.shard, articles)
+        print(f"\nシャードの処理結果を書き出しました: {path}")
+        if index is not None:
+            index.close()
+        return
+
     # メール送信
+    from notifier import EmailNotifier
+
     print("\nメール送信処理を開始します...")
     notifier = EmailNotifier(collector.config)
-    notifier.send_daily_summary(articles)
+    notifier.send_daily_summary(articles, profiler=profiler)
+
+    # 処理済み記事をローカルアーカイブに保存
+    from archive import archive_run
+
+    with profiler.stage('archive'):
+        archive_run(collector.config, articles, kind='grant')
+
+    # 期限から時間の経った助成金をインデックスから削除
+    if index is not None:
+        index.prune(collector.config['grant_index'].get('retention_days', 0))
+        index.close()
+
+    # 結合済みの中間ファイルは次回の結合に混ざらないよう削除
+    for path in shard_files:
+        os.remove(path)
 
 if __name__ == "__main__":
     main()
@@ -1,59 +1,190 @@
 from collector import NewsCollector
-from notifier import EmailNotifier
-from summarizer import NewsSummarizer
-import json
+from sharding import parse_shard
+from profiling import PROFILE_MODES, StageProfiler
+import argparse
 import os
 from dotenv import load_dotenv
 
 # .envファイルがあれば読み込む
 load_dotenv()
 
-def main():
-    # コレクターの初期化
-    collector = NewsCollector()
-    
-    # ニュース収集実行
-    print("ニュース収集を開始します...")
-    articles = collector.collect_news()
-    
-    print(f"\n収集完了: {len(articles)} 件の記事が見つかりました。")
+def parse_args(argv=None):
+    """コマンドライン引数を解析する"""
+    arg_parser = argparse.ArgumentParser(description="技術ニュースを収集・要約してメールで配信します")
+    arg_parser.add_argument(
+        '--dry-run', '--fetch-only',
+        dest='dry_run',
+        action='store_true',
+        help="収集とキーワードフィルタリングのみ実行し、AI要約とメール送信は行わない",
+    )
+    mode = arg_parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        '--shard',
+        type=parse_shard,
+        metavar='i/N',
+        help="N分割したソースのうち i 番目（0始まり）だけを収集・要約し、中間ファイルに書き出す",
+    )
+    mode.add_argument(
+        '--merge',
+        action='store_true',
+        help="全シャードの中間ファイルを結合し、注目記事の選定とメール送信を行う",
+    )
+    arg_parser.add_argument(
+        '--shard-dir',
+        default='data/shards',
+        help="シャードの中間ファイルを置くディレクトリ（デフォルト: data/shards）",
+    )
+    arg_parser.add_argument(
+        '--profile',
+        choices=PROFILE_MODES,
+        help="各ステージを cProfile (cpu) または tracemalloc (mem) で計測する",
+    )
+    arg_parser.add_argument(
+        '--profile-dir',
+        default='data/profiles',
+        help="プロファイル結果の出力先（デフォルト: data/profiles）",
+    )
+    return arg_parser.parse_args(argv)
 
-    # AI要約の実行
-    overall_summary = None
-    notable_articles = []
-    if articles:
-        print("\nAI要約を開始します...")
-        summarizer = NewsSummarizer()
-        
-        # タグカテゴリを取得
-        available_tags = collector.get_tag_categories()
-        
-        for i, article in enumerate(articles, 1):
-            print(f"[{i}/{len(articles)}] Summarizing: {article['title']}...")
-            ai_summary = summarizer.summarize(article['title'], article['summary'])
-            article['summary'] = ai_summary # 要約を上書き
-            
-            # タグ生成
-            print(f"[{i}/{len(articles)}] Generating tags: {article['title']}...")
-            tags = summarizer.generate_tags(article['title'], ai_summary, available_tags)
-            article['tags'] = tags
+def summarize_articles(collector, summarizer, articles):
+    """各記事のAI要約とタグ付けを行う"""
+    # タグカテゴリを取得
+    available_tags = collector.get_tag_categories()
+
+    # ローカルのタグ分類器（過去のLLMタグ付け結果で学習済みの重みを読み込む）
+    from tagger import LocalTagger
+
+    tagger = LocalTagger.from_config(collector.config, available_tags)
+    llm_tagged = 0
+    local_tagged = 0
+    failed = 0
+    
+    for i, article in enumerate(articles, 1):
+        print(f"[{i}/{len(articles)}] Summarizing: {article['title']}...")
+        ai_summary = summarizer.summarize(article['title'], article['summary'])
+        article['summary'] = ai_summary # 要約を上書き
         
-        print("\n注目記事(食産業応用視点)を生成中...")
-        overall_summary = summarizer.generate_overall_summary(articles)
-        if overall_summary:
-            notable_articles = summarizer.parse_notable_articles(overall_summary)
+        # タグ生成（確信度の高い記事はローカル分類器、それ以外はLLM）
+        if tagger is not None:
+            tags, confident = tagger.predict(article['title'], ai_summary)
+            if confident:
+                article['tags'] = tags
+                article['tags_source'] = 'local'
+                local_tagged += 1
+                continue
+        print(f"[{i}/{len(articles)}] Generating tags: {article['title']}...")
+        tags = summarizer.generate_tags(article['title'], ai_summary, available_tags)
+        # 生成に失敗した記事は、タグなしの正解データとして学習されないよう tags_source を付けない
+        article['tags'] = tags or []
+        if tags is not None:
+            article['tags_source'] = 'llm'
+            llm_tagged += 1
+        else:
+            article['tags_source'] = None
+            failed += 1
+
+    print(f"\nタグ付け: LLM {llm_tagged} 件 / ローカル分類器 {local_tagged} 件 / 失敗 {failed} 件")
+
+def select_notable_articles(summarizer, articles):
+    """全記事から食産業応用視点の注目記事を選ぶ"""
+    print("\n注目記事(食産業応用視点)を生成中...")
+    overall_summary = summarizer.generate_overall_summary(articles)
+    if not overall_summary:
+        return []
+    return summarizer.parse_notable_articles(overall_summary)
 
-    # 結果を表示（デバッグ用）
+def print_articles(articles):
+    """結果を表示（デバッグ用）"""
     for i, article in enumerate(articles, 1):
         print(f"\n[{i}] {article['title']}")
         print(f"    Source: {article['source']}")
         print(f"    Keyword: {article.get('matched_keyword')}")
         print(f"    URL: {article['url']}")
 
+def main(argv=None):
+    args = parse_args(argv)
+    label = f"news-shard{args.shard[0]}of{args.shard[1]}" if args.shard else 'news'
+    profiler = StageProfiler(args.profile, args.profile_dir, label=label)
+    try:
+        run(args, profiler)
+    finally:
+        profiler.finish()
+
+def run(args, profiler):
+    # コレクターの初期化
+    collector = NewsCollector()
+    
+    shard_files = []
+    if args.merge:
+        # 各シャードの処理結果を結合（収集・要約は済んでいる）
+        from sharding import read_shards
+
+        print("シャードの処理結果を結合します...")
+        with profiler.stage('merge'):
+            articles, shard_files = read_shards(args.shard_dir, 'news')
+        print(f"\n結合完了: {len(shard_files)} シャードから {len(articles)} 件の記事を読み込みました。")
+    else:
+        # ニュース収集実行
+        if args.shard:
+            print(f"ニュース収集を開始します (shard {args.shard[0]}/{args.shard[1]})...")
+        else:
+            print("ニュース収集を開始します...")
+        articles = collector.collect_news(shard=args.shard, profiler=profiler, dry_run=args.dry_run)
+        
+        print(f"\n収集完了: {len(articles)} 件の記事が見つかりました。")
+
+    # AI要約の実行
+    notable_articles = []
+    if articles and not args.dry_run:
+        # google.genaiは重いため、要約が必要な時だけ読み込む
+        from summarizer import NewsSummarizer
+
+        summarizer = NewsSummarizer()
+        if not args.merge:
+            print("\nAI要約を開始します...")
+            with profiler.stage('summarize'):
+                summarize_articles(collector, summarizer, articles)
+        # 注目記事の選定は全記事が揃った段階（通常実行 or 結合時）で行う
+        if not args.shard:
+            with profiler.stage('overall_summary'):
+                notable_articles = select_notable_articles(summarizer, articles)
+
+    print_articles(articles)
+
+    if args.dry_run:
+        print("\n--dry-run のためAI要約とメール送信をスキップしました。")
+        return
+
+    if args.shard:
+        from sharding import write_shard
+
+        with profiler.stage('write_shard'):
+            path = write_shard(args.shard_dir, 'news', args.shard, articles)
+        print(f"\nシャードの処理結果を書き出しました: {path}")
+        return
+
     # メール送信
+    from notifier import EmailNotifier
+
     print("\nメール送信処理を開始します...")
     notifier = EmailNotifier(collector.config)
-    notifier.send_daily_summary(articles, notable_articles)
+    notifier.send_daily_summary(articles, notable_articles, profiler=profiler)
+
+    # 処理済み記事をローカルアーカイブに保存
+    from archive import archive_run
+
+    with profiler.stage('archive'):
+        archive_run(collector.config, articles, kind='news')
+
+    # 更新したアーカイブでタグ分類器を学習し直し、次回の実行（各シャード）で使う重みを保存
+    from tagger import train_from_archive
+
+    with profiler.stage('train_tagger'):
+        train_from_archive(collector.config, collector.get_tag_categories())
+
+    # 結合済みの中間ファイルは次回の結合に混ざらないよう削除
+    for path in shard_files:
+        os.remove(path)
 
 if __name__ == "__main__":
     main()
@@ -3,6 +3,7 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import html
+from profiling import NULL_PROFILER
 
 class EmailNotifier:
     # タグのスタイル定義
@@ -23,7 +24,7 @@ class EmailNotifier:
         if not self.gmail_user or not self.gmail_password:
             print("Warning: GMAIL_USER or GMAIL_APP_PASSWORD environment variable is not set.")
 
-    def send_daily_summary(self, articles, notable_articles=None):
+    def send_daily_summary(self, articles, notable_articles=None, profiler=NULL_PROFILER):
         """収集した記事リストをメールで送信する"""
         if not articles:
             print("No articles to send.")
@@ -31,7 +32,9 @@ class EmailNotifier:
 
         if not self.gmail_user or not self.gmail_password:
             print("Skipping email send (No Credentials). Printing content instead.")
-            print(self._generate_email_body(articles, notable_articles))
+            with profiler.stage('render'):
+                text_body = self._generate_email_body(articles, notable_articles)
+            print(text_body)
             return
 
         # メールの作成
@@ -47,21 +50,23 @@ class EmailNotifier:
             msg['To'] = to_emails
 
         # 本文の作成（テキスト版とHTML版）
-        text_body = self._generate_email_body(articles, notable_articles)
-        html_body = self._generate_html_body(articles, notable_articles)
+        with profiler.stage('render'):
+            text_body = self._generate_email_body(articles, notable_articles)
+            html_body = self._generate_html_body(articles, notable_articles)
 
-        msg.attach(MIMEText(text_body, 'plain'))
-        msg.attach(MIMEText(html_body, 'html'))
+            msg.attach(MIMEText(text_body, 'plain'))
+            msg.attach(MIMEText(html_body, 'html'))
 
-        try:
-            # GmailのSMTPサーバーに接続
-            server = smtplib.SMTP_SSL('smtp.gmail.com', 465)
-            server.login(self.gmail_user, self.gmail_password)
-            server.send_message(msg)
-            server.quit()
-            print(f"Email sent successfully to {self.config['email']['to_email']}!")
-        except Exception as e:
-            print(f"Error sending email: {e}")
+        with profiler.stage('send'):
+            try:
+                # GmailのSMTPサーバーに接続
+                server = smtplib.SMTP_SSL('smtp.gmail.com', 465)
+                server.login(self.gmail_user, self.gmail_password)
+                server.send_message(msg)
+                server.quit()
+                print(f"Email sent successfully to {self.config['email']['to_email']}!")
+            except Exception as e:
+                print(f"Error sending email: {e}")
 
     def _generate_email_body(self, articles, notable_articles=None):
         """テキスト形式のメール本文（デバッグ用）"""
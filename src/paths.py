@@ -0,0 +1,9 @@
+import os
+
+# リポジトリルート（config.yaml と同じ場所）
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def resolve_path(path):
+    """相対パスをリポジトリルート基準の絶対パスにする（絶対パスはそのまま返す）"""
+    return path if os.path.isabs(path) else os.path.join(BASE_DIR, path)
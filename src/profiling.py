@@ -0,0 +1,122 @@
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+from paths import resolve_path
+
+PROFILE_MODES = ('cpu', 'mem')
+# レポートに載せる関数・確保箇所の数
+TOP_N = 30
+
+
+class StageProfiler:
+    """
+    パイプラインの各ステージ（collect, filter, summarize, ...）を個別に計測する
+
+    - cpu: ステージごとに cProfile を取り、<出力先>/NN-<stage>.pstats と上位関数のテキストを書き出す
+    - mem: tracemalloc のスナップショット差分から、ステージ中に増えた確保箇所の上位を書き出す
+
+    mode が None の時は stage() が何もしないコンテキストを返すだけなので、計測のオーバーヘッドはない。
+    cProfile は入れ子にできないため、stage() は入れ子にせず順番に呼ぶこと。
+    """
+
+    def __init__(self, mode=None, output_dir='data/profiles', label='run'):
+        if mode not in (None,) + PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        self.mode = mode
+        self.label = label
+        self.results = []
+        self._null = nullcontext()
+        self.output_dir = None
+
+        if mode is None:
+            return
+
+        base = resolve_path(output_dir)
+        # 同じ秒に起動した並列シャードが同じディレクトリに書き込まないよう、PIDも含める
+        timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        self.output_dir = os.path.join(base, f"{timestamp}-{label}-{mode}-{os.getpid()}")
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        if mode == 'mem':
+            import tracemalloc
+
+            tracemalloc.start(25)
+
+    @property
+    def enabled(self):
+        return self.mode is not None
+
+    def stage(self, name):
+        """ステージを計測するコンテキストマネージャ（無効時は何もしない）"""
+        if self.mode is None:
+            return self._null
+        return self._profile_stage(name)
+
+    @contextmanager
+    def _profile_stage(self, name):
+        prefix = os.path.join(self.output_dir, f"{len(self.results) + 1:02d}-{name}")
+        start = time.perf_counter()
+
+        if self.mode == 'cpu':
+            import cProfile
+            import pstats
+
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+                elapsed = time.perf_counter() - start
+                profile.dump_stats(prefix + '.pstats')
+                with open(prefix + '.txt', 'w', encoding='utf-8') as f:
+                    stats = pstats.Stats(profile, stream=f)
+                    stats.sort_stats('cumulative').print_stats(TOP_N)
+                self.results.append({'stage': name, 'seconds': elapsed})
+        else:
+            import tracemalloc
+
+            tracemalloc.reset_peak()
+            before = tracemalloc.take_snapshot()
+            try:
+                yield
+            finally:
+                elapsed = time.perf_counter() - start
+                current, peak = tracemalloc.get_traced_memory()
+                after = tracemalloc.take_snapshot()
+                diff = after.compare_to(before, 'lineno')
+                with open(prefix + '.txt', 'w', encoding='utf-8') as f:
+                    f.write(f"stage: {name}\n")
+                    f.write(f"current: {current / 1024:.1f} KiB, peak: {peak / 1024:.1f} KiB\n\n")
+                    f.write(f"Top {TOP_N} allocation changes (by line):\n")
+                    for stat in diff[:TOP_N]:
+                        f.write(f"{stat}\n")
+                self.results.append({'stage': name, 'seconds': elapsed, 'current': current, 'peak': peak})
+
+    def finish(self):
+        """ステージごとの集計を summary.txt に書き出し、表示する"""
+        if self.mode is None:
+            return
+
+        lines = [f"Profile ({self.mode}) - {self.label}"]
+        for result in self.results:
+            line = f"  {result['stage']:<16} {result['seconds']:8.3f}s"
+            if 'peak' in result:
+                line += f"  peak {result['peak'] / 1024 / 1024:8.2f} MiB  retained {result['current'] / 1024 / 1024:8.2f} MiB"
+            lines.append(line)
+        report = "\n".join(lines)
+
+        with open(os.path.join(self.output_dir, 'summary.txt'), 'w', encoding='utf-8') as f:
+            f.write(report + "\n")
+        print(f"\n{report}\nプロファイル結果を書き出しました: {self.output_dir}")
+
+        if self.mode == 'mem':
+            import tracemalloc
+
+            tracemalloc.stop()
+
+
+# プロファイラを渡されなかった場合に使う、何もしないプロファイラ
+NULL_PROFILER = StageProfiler()
@@ -0,0 +1,107 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+
+from article import Article
+from paths import resolve_path
+
+SHARD_SPEC_PATTERN = re.compile(r'^(\d+)/(\d+)$')
+
+
+def parse_shard(spec):
+    """
+    "i/N" 形式のシャード指定を (i, N) に変換する（i は 0 始まり）
+
+    argparse の type として使えるよう、不正な値は ArgumentTypeError を送出する。
+    """
+    match = SHARD_SPEC_PATTERN.match(spec.strip())
+    if not match:
+        raise argparse.ArgumentTypeError(f"shard must be in the form i/N (e.g. 0/4): {spec}")
+    index, count = int(match.group(1)), int(match.group(2))
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must satisfy 0 <= i < N: {spec}")
+    return index, count
+
+
+def shard_for(key, count):
+    """
+    キーをシャード番号に割り当てる（Jump Consistent Hash）
+
+    シャード数を N から N+1 に増やしても、移動するキーは約 1/(N+1) だけで済む。
+    Pythonの hash() は実行ごとに変わるため、キーのハッシュには md5 を使う。
+    """
+    key_hash = int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'big')
+    bucket, candidate = -1, 0
+    while candidate < count:
+        bucket = candidate
+        key_hash = (key_hash * 2862933555777941757 + 1) % (1 << 64)
+        candidate = int((bucket + 1) * ((1 << 31) / ((key_hash >> 33) + 1)))
+    return bucket
+
+
+def shard_path(shard_dir, kind, shard):
+    """シャードの中間ファイルのパス"""
+    index, count = shard
+    directory = resolve_path(shard_dir)
+    return os.path.join(directory, f"{kind}-shard-{index}-of-{count}.jsonl")
+
+
+def write_shard(shard_dir, kind, shard, articles):
+    """シャードの処理結果を1行1記事のJSONLで書き出す"""
+    path = shard_path(shard_dir, kind, shard)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for article in articles:
+            f.write(json.dumps(article.to_dict(), ensure_ascii=False, separators=(',', ':')))
+            f.write('\n')
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_shards(shard_dir, kind):
+    """
+    全シャードの中間ファイルを読み込み、URLで重複を除いて結合する
+
+    Returns:
+        tuple[list[Article], list[str]]: (記事のリスト, 読み込んだファイルのリスト)
+
+    Raises:
+        ValueError: シャード数の異なるファイルが混在している場合
+    """
+    directory = resolve_path(shard_dir)
+    pattern = re.compile(rf'^{re.escape(kind)}-shard-(\d+)-of-(\d+)\.jsonl$')
+
+    shards = {}
+    counts = set()
+    for path in glob.glob(os.path.join(directory, f"{kind}-shard-*.jsonl")):
+        match = pattern.match(os.path.basename(path))
+        if match:
+            shards[int(match.group(1))] = path
+            counts.add(int(match.group(2)))
+
+    if len(counts) > 1:
+        raise ValueError(f"Shard files for different shard counts are mixed in {directory}: {sorted(counts)}")
+    if counts:
+        missing = sorted(set(range(counts.pop())) - set(shards))
+        if missing:
+            print(f"Warning: Missing shard files for shard(s) {missing} in {directory}")
+
+    articles = []
+    seen_urls = set()
+    paths = [shards[index] for index in sorted(shards)]
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                article = Article.from_dict(json.loads(line))
+                url = article.url
+                if url and url in seen_urls:
+                    continue
+                seen_urls.add(url)
+                articles.append(article)
+    return articles, paths
@@ -0,0 +1,228 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+from paths import resolve_path
+
+try:
+    import fcntl
+except ImportError:
+    # Windows では排他しない（シャードの並列実行は Linux / macOS を想定）
+    fcntl = None
+
+# 各ソースで保持する直近の計測数
+HISTORY_SIZE = 30
+
+
+def _percentile(values, percent):
+    """ソート済みでないリストの百分位数（最近傍法）"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class SourceHealth:
+    """
+    ソースごとの取得実績を永続化し、サーキットブレーカーと取得間隔の調整を行う
+
+    - 連続で failure_threshold 回失敗したソースは cooldown_hours の間スキップし、
+      その後1回だけ試す（失敗すればクールダウンを倍にして再びスキップ）
+    - low_yield_runs 回連続で該当記事が0件のソースは low_yield_interval_hours ごとにしか取得しない
+    """
+
+    def __init__(self, path='data/source_health.json', failure_threshold=3, cooldown_hours=12,
+                 max_cooldown_hours=168, low_yield_runs=7, low_yield_interval_hours=72):
+        self.path = resolve_path(path)
+        self.failure_threshold = failure_threshold
+        self.cooldown_hours = cooldown_hours
+        self.max_cooldown_hours = max_cooldown_hours
+        self.low_yield_runs = low_yield_runs
+        self.low_yield_interval_hours = low_yield_interval_hours
+        self.sources = self._load()
+        # 今回の実行で何が起きたか（レポート用）
+        self.run_results = {}
+
+    @classmethod
+    def from_config(cls, config):
+        """config.yaml の source_health セクションから生成する（無効なら None）"""
+        health_config = (config or {}).get('source_health') or {}
+        if not health_config.get('enabled', False):
+            return None
+        return cls(
+            path=health_config.get('path', 'data/source_health.json'),
+            failure_threshold=health_config.get('failure_threshold', 3),
+            cooldown_hours=health_config.get('cooldown_hours', 12),
+            max_cooldown_hours=health_config.get('max_cooldown_hours', 168),
+            low_yield_runs=health_config.get('low_yield_runs', 7),
+            low_yield_interval_hours=health_config.get('low_yield_interval_hours', 72),
+        )
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Warning: Failed to load source health from {self.path}: {e}")
+            return {}
+
+    def save(self):
+        """
+        統計をファイルに書き出す（書き込み途中で壊れないよう一時ファイル経由）
+
+        シャード実行で複数プロセスが同じファイルを使うため、ロックファイルで排他した上で
+        書き込み直前に読み直し、今回取得したソースの統計だけを上書きする。
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path + '.lock', 'w') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            sources = self._load()
+            for name in self.run_results:
+                sources[name] = self.sources[name]
+
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(sources, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def _stats(self, name):
+        return self.sources.setdefault(name, {
+            'latencies': [],
+            'outcomes': [],
+            'yields': [],
+            'bytes': [],
+            'fetches': 0,
+            'errors': 0,
+            'consecutive_failures': 0,
+            'zero_yield_streak': 0,
+            'last_success': None,
+            'last_error': None,
+            'open_until': None,
+            'next_fetch_after': None,
+        })
+
+    def should_fetch(self, name, now=None):
+        """
+        今回このソースを取得すべきか判定する
+
+        Returns:
+            tuple[bool, str or None]: (取得するか, スキップ理由)
+        """
+        now = now or datetime.now()
+        stats = self._stats(name)
+
+        if stats['open_until'] and now < datetime.fromisoformat(stats['open_until']):
+            reason = f"circuit open until {stats['open_until'][:16]} ({stats['consecutive_failures']} consecutive failures)"
+            self.run_results[name] = {'status': 'skipped', 'reason': reason}
+            return False, reason
+        if stats['next_fetch_after'] and now < datetime.fromisoformat(stats['next_fetch_after']):
+            reason = f"low yield, next fetch after {stats['next_fetch_after'][:16]}"
+            self.run_results[name] = {'status': 'skipped', 'reason': reason}
+            return False, reason
+        return True, None
+
+    def last_success(self, name):
+        """最後に取得に成功した日時（なければ None）"""
+        value = self._stats(name)['last_success']
+        return datetime.fromisoformat(value) if value else None
+
+    def record_success(self, name, latency, num_bytes, entries, now=None):
+        """取得成功を記録する（該当記事数は record_yield で後から記録する）"""
+        now = now or datetime.now()
+        stats = self._stats(name)
+        stats['fetches'] += 1
+        stats['consecutive_failures'] = 0
+        stats['open_until'] = None
+        stats['last_success'] = now.isoformat()
+        stats['latencies'] = (stats['latencies'] + [round(latency, 3)])[-HISTORY_SIZE:]
+        stats['bytes'] = (stats['bytes'] + [num_bytes])[-HISTORY_SIZE:]
+        stats['outcomes'] = (stats['outcomes'] + [True])[-HISTORY_SIZE:]
+        self.run_results[name] = {'status': 'ok', 'latency': latency, 'bytes': num_bytes, 'entries': entries}
+
+    def record_failure(self, name, latency, error, now=None):
+        """取得失敗を記録し、閾値を超えたらサーキットを開く"""
+        now = now or datetime.now()
+        stats = self._stats(name)
+        stats['fetches'] += 1
+        stats['errors'] += 1
+        stats['consecutive_failures'] += 1
+        stats['last_error'] = str(error)[:200]
+        stats['latencies'] = (stats['latencies'] + [round(latency, 3)])[-HISTORY_SIZE:]
+        stats['outcomes'] = (stats['outcomes'] + [False])[-HISTORY_SIZE:]
+
+        result = {'status': 'error', 'latency': latency, 'reason': stats['last_error']}
+        over = stats['consecutive_failures'] - self.failure_threshold
+        if over >= 0:
+            cooldown = min(self.cooldown_hours * (2 ** over), self.max_cooldown_hours)
+            stats['open_until'] = (now + timedelta(hours=cooldown)).isoformat()
+            result['reason'] += f" (circuit opened for {cooldown}h)"
+        self.run_results[name] = result
+
+    def record_yield(self, name, matched, now=None):
+        """キーワードフィルタ後の該当記事数を記録し、低収穫ソースの次回取得時期を決める"""
+        now = now or datetime.now()
+        stats = self._stats(name)
+        stats['yields'] = (stats['yields'] + [matched])[-HISTORY_SIZE:]
+        stats['zero_yield_streak'] = stats['zero_yield_streak'] + 1 if matched == 0 else 0
+
+        if stats['zero_yield_streak'] >= self.low_yield_runs:
+            stats['next_fetch_after'] = (now + timedelta(hours=self.low_yield_interval_hours)).isoformat()
+        else:
+            stats['next_fetch_after'] = None
+        if name in self.run_results:
+            self.run_results[name]['matched'] = matched
+
+    def summary(self, name):
+        """レポート用の統計（p50/p95レイテンシ、エラー率、平均バイト数、平均該当数）"""
+        stats = self._stats(name)
+        outcomes = stats['outcomes']
+        return {
+            'p50': _percentile(stats['latencies'], 50),
+            'p95': _percentile(stats['latencies'], 95),
+            'error_rate': (outcomes.count(False) / len(outcomes)) if outcomes else None,
+            'avg_bytes': (sum(stats['bytes']) / len(stats['bytes'])) if stats['bytes'] else None,
+            'avg_yield': (sum(stats['yields']) / len(stats['yields'])) if stats['yields'] else None,
+        }
+
+    def report_lines(self):
+        """今回の実行結果をMarkdownの表にする"""
+        lines = [
+            "| Source | Status | Latency | Entries | Matched | p50 / p95 | Error rate | Avg size | Avg yield | Note |",
+            "| --- | --- | --- | --- | --- | --- | --- | --- | --- | --- |",
+        ]
+
+        def fmt(value, pattern):
+            return pattern.format(value) if value is not None else "-"
+
+        for name, result in self.run_results.items():
+            summary = self.summary(name)
+            lines.append("| {} | {} | {} | {} | {} | {} / {} | {} | {} | {} | {} |".format(
+                name,
+                result['status'],
+                fmt(result.get('latency'), "{:.2f}s"),
+                fmt(result.get('entries'), "{}"),
+                fmt(result.get('matched'), "{}"),
+                fmt(summary['p50'], "{:.2f}s"),
+                fmt(summary['p95'], "{:.2f}s"),
+                fmt(summary['error_rate'], "{:.0%}"),
+                fmt(summary['avg_bytes'] and summary['avg_bytes'] / 1024, "{:.0f} KB"),
+                fmt(summary['avg_yield'], "{:.1f}"),
+                # 表が崩れないよう区切り文字をエスケープする
+                result.get('reason', '').replace('|', '\\|'),
+            ))
+        return lines
+
+    def write_report(self):
+        """実行レポートを標準出力と（GitHub Actions上なら）ジョブサマリーに書き出す"""
+        lines = self.report_lines()
+        print("\n=== Source health ===")
+        print("\n".join(lines))
+
+        step_summary = os.environ.get('GITHUB_STEP_SUMMARY')
+        if step_summary:
+            with open(step_summary, 'a', encoding='utf-8') as f:
+                f.write("## Source health\n\n" + "\n".join(lines) + "\n\n")
@@ -1,6 +1,6 @@
-from google import genai
-from google.genai import types
+import json
 import os
+from datetime import date
 
 class NewsSummarizer:
     # タグがない場合のAI応答のパターン
@@ -11,7 +11,15 @@ class NewsSummarizer:
         self.project_id = os.environ.get('GOOGLE_CLOUD_PROJECT')
         self.location = "us-central1"
         
+        if not self.api_key and not self.project_id:
+            # 認証情報がなければgoogle.genaiの重いimport自体を行わない
+            print("Warning: GOOGLE_API_KEY or GOOGLE_CLOUD_PROJECT is required.")
+            self.client = None
+            return
+
         try:
+            from google import genai
+
             if self.api_key:
                 # API Keyがある場合はそちらを優先（GitHub Actionsなどで楽）
                 self.client = genai.Client(api_key=self.api_key)
@@ -24,10 +32,6 @@ class NewsSummarizer:
                     location=self.location
                 )
                 self.model = "gemini-2.5-flash"
-            else:
-                print("Warning: GOOGLE_API_KEY or GOOGLE_CLOUD_PROJECT is required.")
-                self.client = None
-                return
         except Exception as e:
             print(f"Error initializing GenAI Client: {e}")
             self.client = None
@@ -49,6 +53,8 @@ Summary: {original_summary}
 * 箇条書き3
 """
         
+        from google.genai import types
+
         try:
             response = self.client.models.generate_content(
                 model=self.model,
@@ -64,27 +70,46 @@ Summary: {original_summary}
             return original_summary
 
     def summarize_grant(self, title, original_summary):
-        """助成金情報用の要約を生成"""
+        """
+        助成金情報から事業者向けの要約と構造化情報を抽出
+
+        Returns:
+            dict or None: 以下のキーを含む（抽出できなかった項目は None）。
+                クライアント未設定やAPIエラーで抽出できなかった場合は None
+                - summary (str): 3～5点の箇条書き要約
+                - eligibility (str): 対象者
+                - amount (str): 支援内容・金額
+                - deadline (str): 申請期限（YYYY-MM-DD）
+        """
         if not self.client:
-            return original_summary
+            return None
 
         prompt = f"""
-以下の助成金・補助金情報のタイトルと概要を読んで、事業者向けに日本語で要約してください。
-特に以下の点を含めてください：
-- 対象者（中小企業、スタートアップ、特定業界など）
-- 支援内容（金額や支援の種類）
-- 申請期限や重要な条件
-
+以下の助成金・補助金情報のタイトルと概要を読んで、事業者向けに日本語で要約し、項目を抽出してください。
 
 Title: {title}
 Summary: {original_summary}
 
-出力は3～5点の箇条書きのみにしてください。これ以外は出力しないでください。
-* 箇条書き1
-* 箇条書き2
-* 箇条書き3
+出力項目:
+- summary: 3～5点の箇条書き（各行を「* 」で始める）
+- eligibility: 対象者（中小企業、スタートアップ、特定業界など）。不明ならnull
+- amount: 支援内容（金額や支援の種類）。不明ならnull
+- deadline: 申請期限（YYYY-MM-DD形式）。記載がなければnull
 """
         
+        from google.genai import types
+
+        schema = types.Schema(
+            type=types.Type.OBJECT,
+            properties={
+                'summary': types.Schema(type=types.Type.STRING),
+                'eligibility': types.Schema(type=types.Type.STRING, nullable=True),
+                'amount': types.Schema(type=types.Type.STRING, nullable=True),
+                'deadline': types.Schema(type=types.Type.STRING, nullable=True, description="YYYY-MM-DD"),
+            },
+            required=['summary', 'eligibility', 'amount', 'deadline'],
+        )
+
         try:
             response = self.client.models.generate_content(
                 model=self.model,
@@ -92,12 +117,31 @@ Summary: {original_summary}
                 config=types.GenerateContentConfig(
                     temperature=0.2,
                     max_output_tokens=1024,
+                    response_mime_type="application/json",
+                    response_schema=schema,
                 )
             )
-            return response.text.strip()
+            data = json.loads(response.text)
         except Exception as e:
             print(f"Error generating grant summary for '{title}': {e}")
-            return original_summary
+            return None
+
+        return {
+            'summary': (data.get('summary') or '').strip() or original_summary,
+            'eligibility': data.get('eligibility') or None,
+            'amount': data.get('amount') or None,
+            'deadline': self._normalize_deadline(data.get('deadline')),
+        }
+
+    @staticmethod
+    def _normalize_deadline(value):
+        """YYYY-MM-DD として解釈できる期限だけを返す（それ以外は None）"""
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(value.strip()[:10]).isoformat()
+        except ValueError:
+            return None
 
     def generate_overall_summary(self, articles):
         """全記事の情報を元に、食産業・フードテックへの応用視点で注目記事を3つ選定"""
@@ -145,6 +189,8 @@ Input Articles:
 Output:
 """
 
+        from google.genai import types
+
         try:
             response = self.client.models.generate_content(
                 model=self.model,
@@ -213,8 +259,16 @@ Output:
         return notable_articles
 
     def generate_tags(self, title, summary, available_tags):
-        """記事のタイトルと要約から関連タグを生成"""
-        if not self.client or not available_tags:
+        """
+        記事のタイトルと要約から関連タグを生成
+
+        Returns:
+            list[str] or None: タグのリスト（該当なしなら空リスト）。
+                クライアント未設定やAPIエラーで生成できなかった場合は None
+        """
+        if not self.client:
+            return None
+        if not available_tags:
             return []
 
         # タグリストを文字列にする
@@ -239,6 +293,8 @@ Summary: {summary}
 出力（タグのみ、他の文言は不要）:
 """
         
+        from google.genai import types
+
         try:
             response = self.client.models.generate_content(
                 model=self.model,
@@ -260,16 +316,15 @@ Summary: {summary}
             tags = [tag for tag in tags if tag]
             
             # AIが幻覚でタグを作成していないか検証
-            # available_tagsリストに含まれるタグのみを返す
+            # available_tagsリストに含まれるタグのみを返す（大文字小文字を区別せずに検索）
+            tag_lookup = {available_tag.lower(): available_tag for available_tag in available_tags}
             validated_tags = []
             for tag in tags:
-                # 大文字小文字を区別せずに検索
-                for available_tag in available_tags:
-                    if tag.lower() == available_tag.lower():
-                        validated_tags.append(available_tag)  # 元のavailable_tagの表記を使用
-                        break
+                available_tag = tag_lookup.get(tag.lower())
+                if available_tag and available_tag not in validated_tags:
+                    validated_tags.append(available_tag)  # 元のavailable_tagの表記を使用
             
             return validated_tags
         except Exception as e:
             print(f"Error generating tags for '{title}': {e}")
-            return []
+            return None
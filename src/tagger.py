@@ -0,0 +1,243 @@
+import os
+import re
+import zlib
+
+from paths import resolve_path
+
+# 特徴量ハッシュの次元数（語彙を持たずに固定長ベクトルへ落とす）
+FEATURE_DIM = 4096
+# 英数字は単語単位、それ以外（日本語など）は文字bigramを特徴量にする
+ASCII_WORD_PATTERN = re.compile(r'[a-z0-9]+')
+NON_ASCII_RUN_PATTERN = re.compile(r'[^\x00-\x7f\s、。・「」『』（）()【】]+')
+
+
+def extract_features(text):
+    """テキストをハッシュ化した特徴量インデックスのリストに変換する"""
+    text = text.lower()
+    tokens = ASCII_WORD_PATTERN.findall(text)
+    for run in NON_ASCII_RUN_PATTERN.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return [zlib.crc32(token.encode('utf-8')) % FEATURE_DIM for token in tokens]
+
+
+class LocalTagger:
+    """
+    キーワード辞書と小さな線形モデルで記事タグを推定するCPU上の分類器
+
+    過去にLLMが付けたタグ（アーカイブ）で one-vs-rest のロジスティック回帰を学習する。
+    キーワード辞書のヒットも特徴量として重みを学習するため、"Word cloud" の "cloud" のように
+    LLMが付けなかったヒットはモデルが割り引く。確信度が閾値未満の記事だけ
+    呼び出し側でLLMにフォールバックさせる。学習データが揃うまでは全記事をLLMに任せる。
+
+    学習はアーカイブ更新後に1回だけ行い（train_from_archive）、重みを .npz に保存する。
+    各実行（シャード）は保存済みの重みを読み込むだけにする。
+    """
+
+    # 1記事あたりの最大タグ数（LLMのプロンプトと揃える）
+    MAX_TAGS = 3
+
+    def __init__(self, available_tags, aliases=None, confidence_threshold=0.8):
+        self.available_tags = list(available_tags)
+        self.confidence_threshold = confidence_threshold
+        self.weights = None
+        self.bias = None
+
+        # タグごとにエイリアスを1つの正規表現にまとめる
+        # 英数字のエイリアスは前後が英数字でないことを条件にし、"AI" が "said" にヒットしないようにする
+        # （\b は仮名・漢字も単語文字として扱うため、"AIが" のような日本語との連結にヒットしない）
+        aliases = aliases or {}
+        self.alias_patterns = []
+        for tag in self.available_tags:
+            terms = [tag] + list(aliases.get(tag) or [])
+            parts = []
+            for term in terms:
+                escaped = re.escape(term.lower())
+                parts.append(rf'(?<![a-z0-9]){escaped}(?![a-z0-9])' if term.isascii() else escaped)
+            self.alias_patterns.append(re.compile('|'.join(parts)))
+
+    @classmethod
+    def from_config(cls, config, available_tags):
+        """
+        config.yaml の tagger / tag_aliases セクションから生成し、学習済みの重みがあれば読み込む
+
+        Returns:
+            LocalTagger or None: 無効化されている場合は None
+        """
+        tagger_config = config.get('tagger') or {}
+        if not tagger_config.get('enabled', False) or not available_tags:
+            return None
+
+        tagger = cls(
+            available_tags,
+            aliases=config.get('tag_aliases'),
+            confidence_threshold=tagger_config.get('confidence_threshold', 0.8),
+        )
+        model_path = resolve_path(tagger_config.get('model_path', 'data/tagger_model.npz'))
+        if tagger.load(model_path):
+            print(f"学習済みのタグ分類器を読み込みました: {model_path}")
+        else:
+            print("学習済みのタグ分類器がありません。学習できるまでLLMでタグ付けします。")
+        return tagger
+
+    def _signature(self):
+        """特徴量の並び（タグとキーワード辞書）が保存時と同じかを確かめるための値"""
+        key = "\n".join(self.available_tags + [pattern.pattern for pattern in self.alias_patterns])
+        return zlib.crc32(key.encode('utf-8'))
+
+    def save(self, path):
+        """学習済みの重みを .npz に保存する（書き込み途中で壊れないよう一時ファイル経由）"""
+        import numpy as np
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, weights=self.weights, bias=self.bias, signature=self._signature())
+        os.replace(tmp_path, path)
+
+    def load(self, path):
+        """
+        save() で保存した重みを読み込む
+
+        Returns:
+            bool: 読み込めたか（ファイルがない、またはタグ・キーワード辞書が変わっていれば False）
+        """
+        import numpy as np
+
+        try:
+            with np.load(path) as data:
+                if int(data['signature']) != self._signature():
+                    print(f"Warning: Tag categories or aliases changed since {path} was trained. Ignoring it.")
+                    return False
+                self.weights = data['weights']
+                self.bias = data['bias']
+        except FileNotFoundError:
+            return False
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Warning: Failed to load tagger model from {path}: {e}")
+            return False
+        return True
+
+    def _vectorize(self, texts):
+        """
+        テキストのリストを特徴量行列に変換する
+
+        前半 FEATURE_DIM 列は L2 正規化したハッシュ特徴量、後半はタグごとのキーワード辞書ヒット（0/1）。
+        """
+        import numpy as np
+
+        matrix = np.zeros((len(texts), FEATURE_DIM + len(self.available_tags)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            text = text.lower()
+            indices = extract_features(text)
+            if indices:
+                matrix[row, :FEATURE_DIM] = np.bincount(indices, minlength=FEATURE_DIM)
+            matrix[row, FEATURE_DIM:] = self._keyword_hits(text)
+        hashed = matrix[:, :FEATURE_DIM]
+        np.log1p(hashed, out=hashed)
+        norms = np.linalg.norm(hashed, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        hashed /= norms
+        return matrix
+
+    def train(self, samples, epochs=200, learning_rate=2.0, l2=1e-4):
+        """
+        (タイトル, 要約, タグ) のリストから one-vs-rest ロジスティック回帰を学習する
+
+        全タグを1つの重み行列でまとめて勾配降下するため、学習はNumPyの行列演算だけで済む。
+        """
+        import numpy as np
+
+        tag_index = {tag: i for i, tag in enumerate(self.available_tags)}
+        features = self._vectorize([f"{title} {summary}" for title, summary, _ in samples])
+        labels = np.zeros((len(samples), len(self.available_tags)), dtype=np.float32)
+        for row, (_, _, tags) in enumerate(samples):
+            for tag in tags:
+                if tag in tag_index:
+                    labels[row, tag_index[tag]] = 1.0
+
+        weights = np.zeros((features.shape[1], len(self.available_tags)), dtype=np.float32)
+        bias = np.zeros(len(self.available_tags), dtype=np.float32)
+        n = len(samples)
+        for _ in range(epochs):
+            probs = 1.0 / (1.0 + np.exp(-(features @ weights + bias)))
+            error = probs - labels
+            weights -= learning_rate * (features.T @ error / n + l2 * weights)
+            bias -= learning_rate * error.mean(axis=0)
+
+        self.weights = weights
+        self.bias = bias
+
+    def _keyword_hits(self, text):
+        """小文字化済みのテキストについて、タグごとにキーワード辞書がヒットしたかを返す"""
+        return [bool(pattern.search(text)) for pattern in self.alias_patterns]
+
+    def keyword_tags(self, title, summary=''):
+        """キーワード辞書だけで判定したタグのリスト"""
+        hits = self._keyword_hits(f"{title} {summary}".lower())
+        return [tag for tag, hit in zip(self.available_tags, hits) if hit]
+
+    def predict(self, title, summary):
+        """
+        記事のタグを推定する
+
+        Returns:
+            tuple[list[str], bool]: (タグのリスト, 確信度が閾値以上か)
+        """
+        text = f"{title} {summary}"
+
+        if self.weights is None:
+            # 学習前はキーワード辞書の候補を返すだけで、確信ありとはしない（LLMに任せる）
+            # "Cloud" のような短いエイリアスは誤ヒットしやすく、辞書で処理した記事が
+            # 学習データ（LLMのタグ付け結果）から偏って抜け落ちるのも避けたい
+            return self.keyword_tags(title, summary)[:self.MAX_TAGS], False
+
+        import numpy as np
+
+        features = self._vectorize([text])[0]
+        probs = 1.0 / (1.0 + np.exp(-(features @ self.weights + self.bias)))
+
+        order = np.argsort(-probs)
+        tags = [self.available_tags[i] for i in order[:self.MAX_TAGS] if probs[i] >= 0.5]
+        # 全タグについて「付ける/付けない」の判断が最も際どいものを確信度とする
+        confidence = float(np.min(np.maximum(probs, 1.0 - probs)))
+        return tags, confidence >= self.confidence_threshold
+
+
+def train_from_archive(config, available_tags):
+    """
+    アーカイブ中のLLMタグ付け済み記事でタグ分類器を学習し、重みを保存する
+
+    アーカイブを更新した実行（通常実行、またはシャードの merge）の最後に1回だけ呼ぶ。
+    """
+    tagger_config = config.get('tagger') or {}
+    if not tagger_config.get('enabled', False) or not available_tags:
+        return
+
+    from archive import ArticleArchive
+
+    archive = ArticleArchive.from_config(config)
+    if archive is None:
+        return
+    try:
+        samples = archive.tagged_samples(
+            tags_source='llm',
+            limit=tagger_config.get('max_training_samples', 2000),
+        )
+    finally:
+        archive.close()
+
+    if len(samples) < tagger_config.get('min_training_samples', 50):
+        print(f"タグ分類器の学習データが不足しています ({len(samples)} 件)。学習をスキップします。")
+        return
+
+    tagger = LocalTagger(available_tags, aliases=config.get('tag_aliases'))
+    tagger.train(samples)
+    model_path = resolve_path(tagger_config.get('model_path', 'data/tagger_model.npz'))
+    try:
+        tagger.save(model_path)
+    except OSError as e:
+        print(f"Warning: Failed to save tagger model to {model_path}: {e}")
+        return
+    print(f"タグ分類器を {len(samples)} 件のLLMタグ付け済み記事で学習し、保存しました: {model_path}")